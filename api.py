@@ -11,6 +11,7 @@ from utils import (
     get_low_percentage_aspects,
     get_aspect_distribution,
     load_category_data,
+    latest_category_data_path,
     analyze_category_aspects,
     create_aspect_category_matrix
 )
@@ -246,7 +247,7 @@ def get_category_analytics():
     
     try:
         # Load the category data
-        df = load_category_data()
+        df = load_category_data(latest_category_data_path())
         
         if df is None or len(df) == 0:
             return jsonify({"error": "No category data available"}), 404
@@ -3,7 +3,31 @@ import pandas as pd
 import numpy as np
 import os
 import glob
-from utils import generate_example_csv, get_csv_download_link
+from utils import generate_example_csv
+
+# Page descriptions, each rendered as a single markdown block
+DATA_UPLOAD_PAGE_INFO = """
+### 📤 Data Upload
+
+The Data Upload page provides multiple ways to import your review data:
+- Upload CSV files directly from your computer
+- Import data from your internal API
+- Send data via API requests
+
+[Go to Data Upload](/Data_Upload)
+"""
+
+CATEGORY_ANALYSIS_PAGE_INFO = """
+### 🔍 Category Analysis
+
+The Category Analysis page focuses on the categories and aspects from your internal API:
+- What aspects are in each category?
+- Which aspects are most/least used?
+- Which categories have no aspects?
+- Visualize aspect distribution across categories
+
+[Go to Category Analysis](/Category_Analysis)
+"""
 
 # Show a visual workflow
 st.subheader("How It Works")
@@ -42,27 +66,10 @@ st.subheader("Pages")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    st.markdown("### 📤 Data Upload")
-    st.markdown("""
-    The Data Upload page provides multiple ways to import your review data:
-    - Upload CSV files directly from your computer
-    - Import data from your internal API
-    - Send data via API requests
-    
-    [Go to Data Upload](/Data_Upload)
-    """)
+    st.markdown(DATA_UPLOAD_PAGE_INFO)
 
 with col2:
-    st.markdown("### 🔍 Category Analysis")
-    st.markdown("""
-    The Category Analysis page focuses on the categories and aspects from your internal API:
-    - What aspects are in each category?
-    - Which aspects are most/least used?
-    - Which categories have no aspects?
-    - Visualize aspect distribution across categories
-    
-    [Go to Category Analysis](/Category_Analysis)
-    """)
+    st.markdown(CATEGORY_ANALYSIS_PAGE_INFO)
 
 # Footer
 st.markdown("---")
@@ -1,9 +1,19 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
-import json
-import ast
-from utils import fetch_internal_api_data, fetch_internal_all_api_data
+import io
+import gc
+import hashlib
+import orjson
+from utils import (
+    fetch_internal_api_data,
+    fetch_internal_all_api_data,
+    parse_aspects_column,
+    FAST_SPLIT_MIN_ROWS,
+    with_python_lists,
+)
 
 # Page configuration
 st.set_page_config(
@@ -12,6 +22,298 @@ st.set_page_config(
     layout="wide"
 )
 
+
+def frame_hash(df):
+    """Return a short content hash of `df`, used to skip rewriting unchanged data."""
+    digest = hashlib.blake2b(digest_size=8)
+    for col in df.columns:
+        try:
+            hashed = pd.util.hash_pandas_object(df[col], index=False)
+        except TypeError:
+            # List columns aren't hashable; hash their string form instead
+            hashed = pd.util.hash_pandas_object(df[col].astype(str), index=False)
+        digest.update(str(col).encode())
+        digest.update(hashed.values.tobytes())
+    return digest.hexdigest()
+
+
+def save_frame(df, data_file):
+    """Save `df` to `data_file` (CSV or Parquet) unless that exact data is already there.
+
+    The last save is remembered in session state as (path, content hash, mtime),
+    so clicking again on unchanged data skips the write entirely.
+
+    Returns:
+    --------
+    bool
+        True if the file was written
+    """
+    data_hash = frame_hash(df)
+    last = st.session_state.get('last_saved_hash')
+    if (last is not None and last[:2] == (data_file, data_hash)
+            and os.path.exists(data_file) and os.path.getmtime(data_file) == last[2]):
+        return False
+
+    os.makedirs(os.path.dirname(data_file), exist_ok=True)
+    if data_file.endswith(".parquet"):
+        df.to_parquet(data_file, index=False)
+    else:
+        with_python_lists(df).to_csv(data_file, index=False)
+    st.session_state['last_saved_hash'] = (data_file, data_hash, os.path.getmtime(data_file))
+    return True
+
+
+def records_to_frame(records):
+    """Build an Arrow-backed DataFrame from a list of dicts (e.g. API categories).
+
+    Arrow builds the column buffers in C, and nested fields such as `aspects`
+    stay real list columns. The struct type is inferred over all records, so
+    keys missing from the first one (e.g. `aspects` on a category without
+    aspects) are kept. Empty input gives an empty DataFrame, and records Arrow
+    can't type consistently fall back to plain `pd.DataFrame`.
+    """
+    if not records:
+        return pd.DataFrame()
+    try:
+        table = pa.Table.from_struct_array(pa.array(records))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pd.DataFrame(records)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def aspects_are_nested(df):
+    """Return True if the `aspects` column already holds lists (e.g. straight from the API)."""
+    if 'aspects' not in df.columns:
+        return False
+    first = df['aspects'].first_valid_index()
+    return first is not None and isinstance(df['aspects'].loc[first], list)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_and_parse_csv(file_bytes, aspects_column="aspects_list", nrows=None):
+    """Read uploaded CSV bytes and parse the `aspects` column.
+
+    Cached on the file contents so widget reruns reuse the parsed DataFrame.
+    Pass `nrows` to only read a preview.
+    """
+    df = pd.read_csv(io.BytesIO(file_bytes), nrows=nrows)
+    if 'aspects' in df.columns:
+        df[aspects_column] = parse_aspects_column(df['aspects'])
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_and_parse_json(file_bytes, aspects_column="aspects_parsed"):
+    """Read uploaded JSON bytes and parse the `aspects` column.
+
+    Cached on the file contents so widget reruns reuse the parsed DataFrame.
+    """
+    try:
+        data = orjson.loads(file_bytes)
+    except ValueError:
+        data = None
+
+    # Perigon responses wrap the records in a "data" field
+    if isinstance(data, dict) and isinstance(data.get('data'), list):
+        data = data['data']
+
+    if isinstance(data, list):
+        df = pd.DataFrame.from_records(data)
+    else:
+        # Other shapes (column-oriented dicts etc.) go through pandas
+        df = pd.read_json(io.BytesIO(file_bytes))
+    if 'aspects' in df.columns:
+        df[aspects_column] = parse_aspects_column(df['aspects'])
+    return df
+
+
+def stream_parse_csv(file, out_path, aspects_column="aspects_list", chunksize=50_000, preview_rows=100):
+    """Parse a CSV in chunks and stream the result to `out_path`.
+
+    Peak memory is bounded by `chunksize` regardless of the file size. The
+    output is written as Parquet if `out_path` ends in `.parquet`, otherwise
+    as CSV. Columns are read as strings so every chunk has the same schema
+    (inferring per chunk could turn a column blank in the first chunk into
+    float and text later on). A partially written file is removed on error.
+
+    Returns:
+    --------
+    tuple
+        Total number of rows written and a DataFrame with the first
+        `preview_rows` rows
+    """
+    to_parquet = out_path.endswith(".parquet")
+    csv_file = None if to_parquet else open(out_path, "w", newline="")
+    writer = None
+    num_rows = 0
+    preview = None
+    completed = False
+    try:
+        for chunk in pd.read_csv(file, chunksize=chunksize, dtype="string[pyarrow]"):
+            if 'aspects' in chunk.columns:
+                # Large uploads use the compiled splitter once they pass the
+                # threshold, even though each chunk is below it
+                chunk[aspects_column] = parse_aspects_column(
+                    chunk['aspects'], fast_split=num_rows + len(chunk) >= FAST_SPLIT_MIN_ROWS)
+            if to_parquet:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema, compression="snappy")
+                writer.write_table(table)
+            else:
+                with_python_lists(chunk).to_csv(csv_file, header=(num_rows == 0), index=False)
+            num_rows += len(chunk)
+            if preview is None:
+                preview = chunk.head(preview_rows)
+            del chunk
+            gc.collect()
+        completed = True
+    finally:
+        if writer is not None:
+            writer.close()
+        if csv_file is not None:
+            csv_file.close()
+        if not completed and os.path.exists(out_path):
+            os.remove(out_path)
+    return num_rows, preview if preview is not None else pd.DataFrame()
+
+
+# Previews rely on st.dataframe's row virtualization (only visible rows are
+# rendered); this cap only guards against truly huge frames
+PREVIEW_MAX_ROWS = 10_000
+
+# Page to open once category data has been saved
+CATEGORY_ANALYSIS_PAGE = "pages/3_Category_Analysis.py"
+
+# API Integration tab text, rendered as a single markdown block
+API_INTEGRATION_DOCS = """\
+## API Integration
+
+### Upload data programmatically via our API
+
+You can send data to this application programmatically using our REST API. 
+This allows you to integrate with your existing systems and automate data analysis.
+
+**Base URL**: `http://localhost:5001`
+
+#### Upload CSV data via API:
+
+```bash
+curl -X POST -H "X-API-Key: YOUR_API_KEY" \\
+     -F "file=@your_file.csv" \\
+     http://localhost:5001/api/upload
+```
+
+#### API Endpoints
+
+| Method | Endpoint | Description |
+|--------|----------|-------------|
+| POST | `/api/upload` | Upload review data (CSV) |
+| POST | `/api/upload/review_categories/csv` | Upload category data (CSV) |
+| POST | `/api/upload/review_categories/json` | Upload category data (JSON) |
+| GET | `/api/analytics/categories` | Get category analytics |
+| GET | `/api/analytics/reviews` | Get review analytics |
+
+#### Authentication
+All API requests require the `X-API-Key` header. Contact the administrator to get your API key.
+"""
+
+# Example client code shown on the API Integration tab
+PY_EXAMPLE = """\
+import requests
+
+# API configuration
+api_key = "YOUR_API_KEY"
+base_url = "http://localhost:5001"
+
+# Upload a CSV file
+def upload_csv(file_path):
+    headers = {
+        "X-API-Key": api_key
+    }
+    
+    with open(file_path, 'rb') as f:
+        files = {
+            'file': (file_path, f, 'text/csv')
+        }
+        
+        response = requests.post(
+            f"{base_url}/api/upload",
+            headers=headers,
+            files=files
+        )
+        
+    return response.json()
+
+# Get analytics
+def get_analytics():
+    headers = {
+        "X-API-Key": api_key
+    }
+    
+    response = requests.get(
+        f"{base_url}/api/analytics/reviews",
+        headers=headers
+    )
+    
+    return response.json()
+
+# Example usage
+csv_path = "reviews.csv"
+result = upload_csv(csv_path)
+print(result)
+
+analytics = get_analytics()
+print(analytics)
+"""
+
+JS_EXAMPLE = """\
+// Using fetch API in JavaScript
+const apiKey = "YOUR_API_KEY";
+const baseUrl = "http://localhost:5001";
+
+// Upload a CSV file
+async function uploadCSV(file) {
+    const formData = new FormData();
+    formData.append('file', file);
+    
+    const response = await fetch(`${baseUrl}/api/upload`, {
+        method: 'POST',
+        headers: {
+            'X-API-Key': apiKey
+        },
+        body: formData
+    });
+    
+    return response.json();
+}
+
+// Get analytics
+async function getAnalytics() {
+    const response = await fetch(`${baseUrl}/api/analytics/reviews`, {
+        method: 'GET',
+        headers: {
+            'X-API-Key': apiKey
+        }
+    });
+    
+    return response.json();
+}
+
+// Example usage (in an async function)
+async function example() {
+    const fileInput = document.querySelector('input[type="file"]');
+    const file = fileInput.files[0];
+    
+    const uploadResult = await uploadCSV(file);
+    console.log(uploadResult);
+    
+    const analytics = await getAnalytics();
+    console.log(analytics);
+}
+"""
+
+
 # App title and description
 st.title("Data Upload")
 st.markdown("""
@@ -19,10 +321,10 @@ Upload your review data to start the analysis. You can upload a CSV file directl
 import from our internal API, or send data programmatically via our API.
 """)
 
-# Create tabs for different upload methods
-tabs = st.tabs(["CSV Upload", "Import from API", "API Integration"])
-
-with tabs[0]:
+# Each tab is a fragment, so its widgets only rerun that tab instead of the whole page
+# Tab 1: CSV Upload
+@st.fragment
+def csv_upload_fragment():
     st.header("Upload CSV File")
 
     # Instructions
@@ -46,72 +348,36 @@ with tabs[0]:
         # Download link
         st.download_button(
             label="Download Example CSV",
-            data=example_data.getvalue(),
+            data=example_data,
             file_name="example_reviews.csv",
             mime="text/csv"
         )
 
-        # Load and process
-        example_data.seek(0)
-        df = pd.read_csv(example_data)
+        # Load and parse aspects (cached on the file contents)
+        df = load_and_parse_csv(example_data)
 
         st.success("✅ Example data loaded successfully!")
         st.subheader("Data Preview")
-        st.dataframe(df)
-
-        # Parse aspects
-        if 'aspects' in df.columns:
-            def parse_aspects(val):
-                try:
-                    if val.startswith("[") and val.endswith("]"):
-                        return ast.literal_eval(val)
-                    return [a.strip() for a in val.split(',') if a.strip()]
-                except Exception:
-                    return []
-
-            df['aspects_list'] = df['aspects'].apply(lambda x: parse_aspects(str(x)) if pd.notnull(x) else [])
+        st.dataframe(df.head(PREVIEW_MAX_ROWS), height=400, use_container_width=True)
 
         if st.button("Use Example Data for Analysis"):
             if not df.empty:
-                os.makedirs("example_data", exist_ok=True)
                 data_file = "example_data/review_categories.csv"
-                df.to_csv(data_file, index=False)
-
-                num_rows = df.shape[0]
-
-                st.success(f"✅ Full categories data ({num_rows} records) saved to file.")
-
-                st.subheader("Category Data Preview")
-                st.dataframe(df.head(100))  # Just show first 100 for performance
+                save_frame(df, data_file)
 
                 # Save only file path, not entire dataframe
                 st.session_state['category_data_path'] = data_file
 
-                if 'redirect_to' not in st.session_state:
-                    st.session_state['redirect_to'] = '/Category_Analysis'
-
-                st.info("You will be automatically redirected to the Category Analysis page.")
-                st.markdown("<meta http-equiv='refresh' content='2; url=/Category_Analysis'>", unsafe_allow_html=True)
-                st.markdown("[Click here if not redirected](/Category_Analysis)")
+                # In-app navigation keeps session state (no full browser reload)
+                st.switch_page(CATEGORY_ANALYSIS_PAGE)
 
     else:
         uploaded_file = st.file_uploader("Choose a CSV file", type=["csv"])
 
         if uploaded_file is not None:
             from utils import process_csv  # Optional: you can inline the logic if you prefer
-            df = pd.read_csv(uploaded_file)
-
-            # Parse aspects
-            if 'aspects' in df.columns:
-                def parse_aspects(val):
-                    try:
-                        if val.startswith("[") and val.endswith("]"):
-                            return ast.literal_eval(val)
-                        return [a.strip() for a in val.split(',') if a.strip()]
-                    except Exception:
-                        return []
-
-                df['aspects_list'] = df['aspects'].apply(lambda x: parse_aspects(str(x)) if pd.notnull(x) else [])
+            # Only the first rows are needed for the preview (cached on the file contents)
+            df = load_and_parse_csv(uploaded_file.getvalue(), nrows=100)
 
             st.success("✅ File uploaded and processed successfully!")
 
@@ -122,18 +388,23 @@ with tabs[0]:
                 st.dataframe(df.head(10))
 
             if st.button("Use This Data for Analysis"):
-                st.session_state['uploaded_data'] = df
-                st.success("✅ Data saved for analysis!")
-
-                if 'redirect_to' not in st.session_state:
-                    st.session_state['redirect_to'] = '/Analytics_Charts'
+                # Stream the full file to Parquet in chunks instead of holding it in memory
+                os.makedirs("example_data", exist_ok=True)
+                data_file = "example_data/uploaded_reviews.parquet"
+                uploaded_file.seek(0)
+                try:
+                    stream_parse_csv(uploaded_file, data_file)
+                except Exception as e:
+                    st.error(f"Error saving the uploaded data: {str(e)}")
+                else:
+                    # Save only file path, not entire dataframe (read back with load_uploaded_data)
+                    st.session_state['uploaded_data_path'] = data_file
+                    st.success("✅ Data saved for analysis!")
 
-                st.info("You will be automatically redirected to the Analytics page.")
-                st.markdown("<meta http-equiv='refresh' content='2; url=/Analytics_Charts'>", unsafe_allow_html=True)
-                st.markdown("[Click here if not redirected](/Analytics_Charts)")
 
 # Tab 2: Import from API
-with tabs[1]:
+@st.fragment
+def api_import_fragment():
     st.header("Import from APIs")
     
     # API selection dropdown
@@ -211,6 +482,10 @@ with tabs[1]:
                 options=["asc", "desc"],
                 index=0
             )
+        with col3:
+            # API responses are cached for a few minutes; this forces a refetch
+            if st.button("Refresh", key="refresh_paginated"):
+                fetch_internal_api_data.clear()
         
         # Button to fetch data
         fetch_button_label = "Fetch Categories (paginated)"
@@ -223,6 +498,8 @@ with tabs[1]:
                 )
                 
                 if isinstance(categories, dict) and "error" in categories:
+                    # Don't keep serving a cached error
+                    fetch_internal_api_data.clear()
                     st.error(f"Error fetching categories: {categories['error']}")
                     if "details" in categories:
                         st.error(f"Details: {categories['details']}")
@@ -230,31 +507,23 @@ with tabs[1]:
                     # Successfully fetched categories
                     st.success(f"Successfully fetched {len(categories)} categories from the API")
                     
-                    # Convert to DataFrame for easier handling
-                    categories_df = pd.DataFrame(categories)
+                    # Convert to DataFrame for easier handling (built column-wise by Arrow)
+                    categories_df = records_to_frame(categories)
                     
                     # Save the data to file for later use (cached)
                     if not categories_df.empty:
-                        os.makedirs("example_data", exist_ok=True)
-                        data_file = "example_data/review_categories.csv"
-                        categories_df.to_csv(data_file, index=False)
-
-                        num_rows = categories_df.shape[0]
-
-                        st.success(f"✅ Full categories data ({num_rows} records) saved to file.")
-
-                        st.subheader("Category Data Preview")
-                        st.dataframe(categories_df.head(100))  # Just show first 100 for performance
+                        if aspects_are_nested(categories_df):
+                            # Parquet keeps the aspects lists as-is, no stringify/re-parse round-trip
+                            data_file = "example_data/review_categories.parquet"
+                        else:
+                            data_file = "example_data/review_categories.csv"
+                        save_frame(categories_df, data_file)
 
                         # Save only file path, not entire dataframe
                         st.session_state['category_data_path'] = data_file
 
-                        if 'redirect_to' not in st.session_state:
-                            st.session_state['redirect_to'] = '/Category_Analysis'
-
-                        st.info("You will be automatically redirected to the Category Analysis page.")
-                        st.markdown("<meta http-equiv='refresh' content='2; url=/Category_Analysis'>", unsafe_allow_html=True)
-                        st.markdown("[Click here if not redirected](/Category_Analysis)")
+                        # In-app navigation keeps session state (no full browser reload)
+                        st.switch_page(CATEGORY_ANALYSIS_PAGE)
 
     elif api_selection == "Review Categories API all (Perigon)":
         # Expand section about the API
@@ -293,39 +562,41 @@ with tabs[1]:
             """)
         
         fetch_button_label = "Fetch All Categories"
-        if st.button(fetch_button_label):
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            fetch_clicked = st.button(fetch_button_label)
+        with col2:
+            # API responses are cached for a few minutes; this forces a refetch
+            if st.button("Refresh", key="refresh_all"):
+                fetch_internal_all_api_data.clear()
+
+        if fetch_clicked:
             with st.spinner("Fetching all categories from Perigon API..."):
                 categories = fetch_internal_all_api_data()
 
                 if isinstance(categories, dict) and "error" in categories:
+                    # Don't keep serving a cached error
+                    fetch_internal_all_api_data.clear()
                     st.error(f"Error fetching categories: {categories['error']}")
                     if "details" in categories:
                         st.error(f"Details: {categories['details']}")
                 else:
                     st.success(f"Successfully fetched {len(categories)} categories from the API")
-                    categories_df = pd.DataFrame(categories)
+                    categories_df = records_to_frame(categories)
 
                     if not categories_df.empty:
-                        os.makedirs("example_data", exist_ok=True)
-                        data_file = "example_data/review_categories.csv"
-                        categories_df.to_csv(data_file, index=False)
-
-                        num_rows = categories_df.shape[0]
-
-                        st.success(f"✅ Full categories data ({num_rows} records) saved to file.")
-
-                        st.subheader("Category Data Preview")
-                        st.dataframe(categories_df.head(100))  # Just show first 100 for performance
+                        if aspects_are_nested(categories_df):
+                            # Parquet keeps the aspects lists as-is, no stringify/re-parse round-trip
+                            data_file = "example_data/review_categories.parquet"
+                        else:
+                            data_file = "example_data/review_categories.csv"
+                        save_frame(categories_df, data_file)
 
                         # Save only file path, not entire dataframe
                         st.session_state['category_data_path'] = data_file
 
-                        if 'redirect_to' not in st.session_state:
-                            st.session_state['redirect_to'] = '/Category_Analysis'
-
-                        st.info("You will be automatically redirected to the Category Analysis page.")
-                        st.markdown("<meta http-equiv='refresh' content='2; url=/Category_Analysis'>", unsafe_allow_html=True)
-                        st.markdown("[Click here if not redirected](/Category_Analysis)")
+                        # In-app navigation keeps session state (no full browser reload)
+                        st.switch_page(CATEGORY_ANALYSIS_PAGE)
                     
     elif api_selection == "Custom Categories API (Upload)":
         st.subheader("Upload Categories CSV/JSON File")
@@ -342,46 +613,41 @@ with tabs[1]:
         
         if uploaded_file is not None:
             try:
-                # Check file type and process accordingly
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                    file_type = "CSV"
-                else:
-                    df = pd.read_json(uploaded_file)
-                    file_type = "JSON"
-                
+                file_type = "CSV" if uploaded_file.name.endswith('.csv') else "JSON"
+
+                # Only parse and save each uploaded file once, not on every rerun
+                if st.session_state.get('custom_categories_file_id') != uploaded_file.file_id:
+                    os.makedirs("example_data", exist_ok=True)
+                    filename = f"custom_categories_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                    data_file = f"example_data/{filename}"
+
+                    # Check file type and process accordingly
+                    if file_type == "CSV":
+                        # Stream to disk in chunks so large files never sit fully in memory
+                        uploaded_file.seek(0)
+                        _, preview_df = stream_parse_csv(uploaded_file, data_file, aspects_column="aspects_parsed")
+                    else:
+                        df = load_and_parse_json(uploaded_file.getvalue())
+                        with_python_lists(df).to_csv(data_file, index=False)
+                        preview_df = df.head(100)
+
+                    st.session_state['custom_categories_file_id'] = uploaded_file.file_id
+                    st.session_state['should_redirect'] = True
+                    st.session_state['custom_categories_preview'] = preview_df
+                    # Store only the file path, not the entire dataframe
+                    st.session_state['category_data_path'] = data_file
+
+                # Auto navigation (once per uploaded file); nothing rendered
+                # before it would be seen, so it happens first
+                if st.session_state.pop('should_redirect', False):
+                    st.switch_page(CATEGORY_ANALYSIS_PAGE)
+
                 # Display success message
                 st.success(f"✅ Successfully loaded {file_type} file: {uploaded_file.name}")
                 
-                # Process aspects column if it exists
-                if 'aspects' in df.columns:
-                    try:
-                        df['aspects_parsed'] = df['aspects'].apply(
-                            lambda x: json.loads(x) if isinstance(x, str) and x.strip() else []
-                        )
-                    except:
-                        # Try with ast literal eval as fallback
-                        import ast
-                        df['aspects_parsed'] = df['aspects'].apply(
-                            lambda x: ast.literal_eval(x) if isinstance(x, str) and x.strip() else []
-                        )
-                
-                # Save to file
-                os.makedirs("example_data", exist_ok=True)
-                filename = f"custom_categories_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                df.to_csv(f"example_data/{filename}", index=False)
-                
                 # Show data preview
                 st.subheader("Data Preview")
-                st.dataframe(df.head(10))
-                
-                # Store in session state
-                st.session_state['category_data'] = df
-                
-                # Auto navigation
-                st.success("Categories data saved successfully. Redirecting to analysis...")
-                st.markdown("<meta http-equiv='refresh' content='2; url=/Category_Analysis'>", unsafe_allow_html=True)
-                st.markdown("[Click here if not redirected](/Category_Analysis)")
+                st.dataframe(st.session_state['custom_categories_preview'].head(10))
                 
             except Exception as e:
                 st.error(f"Error processing file: {str(e)}")
@@ -390,139 +656,34 @@ with tabs[1]:
     else:  # Coming Soon option
         st.info("This API source is coming soon. Please check back later.")
 
+
 # Tab 3: API Integration
-with tabs[2]:
-    st.header("API Integration")
-    
-    st.markdown("""
-    ### Upload data programmatically via our API
-    
-    You can send data to this application programmatically using our REST API. 
-    This allows you to integrate with your existing systems and automate data analysis.
-    
-    **Base URL**: `http://localhost:5001`
-    
-    #### Upload CSV data via API:
-    
-    ```bash
-    curl -X POST -H "X-API-Key: YOUR_API_KEY" \\
-         -F "file=@your_file.csv" \\
-         http://localhost:5001/api/upload
-    ```
-    
-    #### API Endpoints
-    
-    | Method | Endpoint | Description |
-    |--------|----------|-------------|
-    | POST | `/api/upload` | Upload review data (CSV) |
-    | POST | `/api/upload/review_categories/csv` | Upload category data (CSV) |
-    | POST | `/api/upload/review_categories/json` | Upload category data (JSON) |
-    | GET | `/api/analytics/categories` | Get category analytics |
-    | GET | `/api/analytics/reviews` | Get review analytics |
-    
-    #### Authentication
-    All API requests require the `X-API-Key` header. Contact the administrator to get your API key.
-    """)
+@st.fragment
+def api_integration_fragment():
+    st.markdown(API_INTEGRATION_DOCS)
     
     # Show API Key (for demo purposes)
     st.warning("For demonstration purposes, your API key is: 8d84126c-4184-4c1f-a7f1-efd247bee990")
     
-    # Add some example code
-    with st.expander("Python Example Code"):
-        st.code("""
-import requests
-
-# API configuration
-api_key = "YOUR_API_KEY"
-base_url = "http://localhost:5001"
-
-# Upload a CSV file
-def upload_csv(file_path):
-    headers = {
-        "X-API-Key": api_key
-    }
+    # Add some example code (only sent to the browser when toggled on)
+    if st.toggle("Show Python example code"):
+        st.code(PY_EXAMPLE, language="python")
     
-    with open(file_path, 'rb') as f:
-        files = {
-            'file': (file_path, f, 'text/csv')
-        }
-        
-        response = requests.post(
-            f"{base_url}/api/upload",
-            headers=headers,
-            files=files
-        )
-        
-    return response.json()
+    if st.toggle("Show JavaScript example code"):
+        st.code(JS_EXAMPLE, language="javascript")
 
-# Get analytics
-def get_analytics():
-    headers = {
-        "X-API-Key": api_key
-    }
-    
-    response = requests.get(
-        f"{base_url}/api/analytics/reviews",
-        headers=headers
-    )
-    
-    return response.json()
 
-# Example usage
-csv_path = "reviews.csv"
-result = upload_csv(csv_path)
-print(result)
-
-analytics = get_analytics()
-print(analytics)
-        """, language="python")
-    
-    with st.expander("JavaScript Example Code"):
-        st.code("""
-// Using fetch API in JavaScript
-const apiKey = "YOUR_API_KEY";
-const baseUrl = "http://localhost:5001";
+# Create tabs for different upload methods
+tabs = st.tabs(["CSV Upload", "Import from API", "API Integration"])
 
-// Upload a CSV file
-async function uploadCSV(file) {
-    const formData = new FormData();
-    formData.append('file', file);
-    
-    const response = await fetch(`${baseUrl}/api/upload`, {
-        method: 'POST',
-        headers: {
-            'X-API-Key': apiKey
-        },
-        body: formData
-    });
-    
-    return response.json();
-}
+with tabs[0]:
+    csv_upload_fragment()
 
-// Get analytics
-async function getAnalytics() {
-    const response = await fetch(`${baseUrl}/api/analytics/reviews`, {
-        method: 'GET',
-        headers: {
-            'X-API-Key': apiKey
-        }
-    });
-    
-    return response.json();
-}
+with tabs[1]:
+    api_import_fragment()
 
-// Example usage (in an async function)
-async function example() {
-    const fileInput = document.querySelector('input[type="file"]');
-    const file = fileInput.files[0];
-    
-    const uploadResult = await uploadCSV(file);
-    console.log(uploadResult);
-    
-    const analytics = await getAnalytics();
-    console.log(analytics);
-}
-        """, language="javascript")
+with tabs[2]:
+    api_integration_fragment()
 
 # Footer
 st.markdown("---")
@@ -1,14 +1,19 @@
+import io
 import streamlit as st
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # Render off-screen; the figures are only ever saved as PNG
 import matplotlib.pyplot as plt
 import altair as alt
 from utils import (
+    get_category_data_path,
     load_category_data,
     analyze_category_aspects,
     create_aspect_category_matrix,
-    get_csv_download_link,
-    get_json_download_link
+    category_name_positions,
+    get_csv_download_data,
+    get_json_download_data
 )
 
 # Page configuration
@@ -18,6 +23,153 @@ st.set_page_config(
     layout="wide"
 )
 
+def figure_png(fig):
+    """Render a matplotlib figure to PNG bytes (same settings as st.pyplot) and close it."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+# Matplotlib charts are cached as PNG bytes so reruns from unrelated widgets don't replot them
+@st.cache_data(show_spinner=False)
+def aspect_type_pie_png(types, type_counts):
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.pie(type_counts, labels=list(types), autopct='%1.1f%%', startangle=90)
+    ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+    return figure_png(fig)
+
+
+@st.cache_data(show_spinner=False)
+def aspect_usage_hist_png(counts):
+    # Summary stats
+    mean_val = np.mean(counts)
+    median_val = np.median(counts)
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # Histogram
+    ax.hist(counts, bins=20, alpha=0.7, color='steelblue', edgecolor='black')
+
+    # Labels
+    ax.set_xlabel("Number of Categories Using the Aspect")
+    ax.set_ylabel("Number of Aspects")
+    ax.set_title("How Widely Aspects Are Used Across Categories")
+
+    # Gridlines
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+
+    # Add mean and median lines
+    ax.axvline(mean_val, color='red', linestyle='dashed', linewidth=1.5, label=f'Mean: {mean_val:.1f}')
+    ax.axvline(median_val, color='green', linestyle='dotted', linewidth=1.5, label=f'Median: {median_val:.1f}')
+
+    # Legend
+    ax.legend()
+
+    return figure_png(fig)
+
+
+# The category explorer and the matrix are fragments: changing the selected
+# category (or clicking a download) reruns only that part of the page
+@st.fragment
+def category_detail_fragment(category_data, data_path, max_rows=None):
+    # Allow exploring specific categories and their aspects
+    st.subheader("Explore Category Aspects")
+    selected_category = st.selectbox(
+        "Select a category to see its aspects:",
+        options=category_data['name'].tolist()
+    )
+
+    if selected_category:
+        category_row = category_data.iloc[category_name_positions(data_path, max_rows)[selected_category]]
+        aspect_list = category_row['aspects_parsed']
+
+        if aspect_list:
+            st.success(f"The category '{selected_category}' has {len(aspect_list)} aspects:")
+
+            # Display aspects in a more readable format
+            # (split each "Type/Subtype" aspect once, in a single vectorized call)
+            aspects = pd.Series(aspect_list, dtype=str)
+            parts = aspects.str.split('/', expand=True).reindex(columns=[0, 1])
+            aspects_df = pd.DataFrame({
+                'Aspect': aspects,
+                'Type': parts[0].where(parts[1].notna(), 'Other'),
+                'Subtype': parts[1].fillna(aspects)
+            })
+
+            # Group by type and display
+            st.dataframe(aspects_df, use_container_width=True)
+
+            # Create a pie chart showing the distribution of aspect types
+            type_counts = aspects_df['Type'].value_counts().rename_axis('Type').reset_index(name='Count')
+
+            st.image(
+                aspect_type_pie_png(tuple(type_counts['Type']), tuple(type_counts['Count'].tolist())),
+                use_container_width=True,
+            )
+        else:
+            st.warning(f"The category '{selected_category}' has no aspects defined.")
+
+
+@st.fragment
+def aspect_matrix_fragment(category_data):
+    matrix_df = create_aspect_category_matrix(category_data)
+
+    if matrix_df is not None and isinstance(matrix_df, pd.DataFrame):
+        max_aspects, max_categories = 500, 500
+
+        if len(matrix_df) > max_aspects:
+            st.info(
+                f"Showing only the first {max_aspects} aspects for clarity. "
+                "Download the full matrix below."
+            )
+
+        # Trim to first N categories (after the 'aspect' column)
+        category_cols = list(matrix_df.columns[1 : max_categories + 1])
+        matrix_subset = matrix_df.loc[:, ["aspect"] + category_cols].head(max_aspects)
+
+        # Long frame of only the set cells, straight from the int8 values;
+        # empty cells are never materialized (the background is already white)
+        rows, cols = np.nonzero(matrix_subset[category_cols].to_numpy())
+        matrix_long = pd.DataFrame({
+            "aspect": matrix_subset["aspect"].to_numpy()[rows],
+            "category": np.asarray(category_cols, dtype=object)[cols],
+        })
+
+        heatmap = (
+            alt.Chart(matrix_long)
+            # Fixed axis domains keep the full grid even for empty rows/columns
+            .mark_rect(color="blue")
+            .encode(
+                x=alt.X("category:N", title="Category", scale=alt.Scale(domain=sorted(category_cols))),
+                y=alt.Y("aspect:N", title="Aspect", scale=alt.Scale(domain=sorted(matrix_subset["aspect"]))),
+                tooltip=["aspect:N", "category:N"],
+            )
+            .properties(width=1000, height=800, title="Aspect-Category Matrix")
+        )
+        st.altair_chart(heatmap, use_container_width=True)
+
+        # ────────────────────────────────────────────────────────────
+        # Download links
+        # ────────────────────────────────────────────────────────────
+        st.markdown("### Download Full Matrix")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "Download CSV file",
+                data=get_csv_download_data(matrix_df),
+                file_name="aspect_category_matrix.csv",
+                mime="text/csv",
+            )
+        with col2:
+            st.download_button(
+                "Download JSON file",
+                data=get_json_download_data(matrix_df),
+                file_name="aspect_category_matrix.json",
+                mime="application/json",
+            )
+
+
 # App title and description
 st.title("Category & Aspect Analysis")
 st.markdown("""
@@ -25,16 +177,30 @@ This page provides analytics specifically for review categories and their aspect
 based on data from the internal API.
 """)
 
+# Optionally analyze only the first N categories of a very large file
+with st.sidebar:
+    max_rows = st.number_input(
+        "Limit categories loaded (0 = all)", min_value=0, value=0, step=100,
+        help="Only the first N rows of the category file are read."
+    )
+
 # Load the category data
-category_data = load_category_data()
+category_data_path = get_category_data_path()
+max_rows = max_rows or None
+category_data = load_category_data(category_data_path, max_rows=max_rows)
 
 if category_data is None:
     st.error("Failed to load category data. Please check the file path and format.")
     st.stop()
 
-# Display some basic stats
-total_categories = len(category_data)
-categories_with_aspects = len(category_data[category_data['aspectsCount'] > 0])
+# The per-category aspect sets are an internal lookup column; tables and downloads leave them out
+raw_category_data = category_data.drop(columns=['aspects_parsed_set'], errors='ignore')
+
+# Display some basic stats (one numpy array, no filtered copies of the frame).
+# Blank counts are NaN; like Series.mean(), the average skips them.
+aspect_counts = category_data['aspectsCount'].to_numpy(dtype='float64', na_value=np.nan)
+total_categories = aspect_counts.size
+categories_with_aspects = int((aspect_counts > 0).sum())
 categories_without_aspects = total_categories - categories_with_aspects
 
 # Create a summary section
@@ -48,7 +214,7 @@ with col2:
 with col3:
     st.metric("Categories without Aspects", categories_without_aspects)
 with col4:
-    avg_aspects = category_data['aspectsCount'].mean()
+    avg_aspects = np.nanmean(aspect_counts) if total_categories else float('nan')
     st.metric("Avg Aspects per Category", f"{avg_aspects:.1f}")
 
 # Create tabs for different analysis views
@@ -69,73 +235,22 @@ with tabs[0]:
     # Sort categories by aspect count
     sorted_categories = category_data.sort_values('aspectsCount', ascending=False)
     
-    # Create a bar chart of aspect counts by category with dynamic sizing
-    # Calculate the figure height based on number of categories (minimum 10, with 0.4 units per category)
-    num_categories = len(sorted_categories[sorted_categories['aspectsCount'] > 0])
-    figure_height = max(10, num_categories * 0.4)  # Dynamic height with minimum of 10
-    
-    fig, ax = plt.subplots(figsize=(12, figure_height))
-    
     # Only include categories with aspects
     categories_with_data = sorted_categories[sorted_categories['aspectsCount'] > 0]
-    
-    # Create bars
-    bars = ax.barh(categories_with_data['name'], categories_with_data['aspectsCount'])
-    
-    # Add labels and formatting
-    ax.set_xlabel('Number of Aspects')
-    ax.set_ylabel('Category')
-    ax.set_title('Number of Aspects by Category', fontsize=16)
-    ax.grid(axis='x', linestyle='--', alpha=0.7)
-    
-    # Add the values at the end of each bar
-    for bar in bars:
-        width = bar.get_width()
-        label_x_pos = width + 0.3
-        ax.text(label_x_pos, bar.get_y() + bar.get_height()/2, f'{width:.0f}', 
-                ha='left', va='center')
-                
-    # Adjust layout and margins
-    plt.tight_layout()
-    plt.subplots_adjust(left=0.25)  # Add more space for category names
-    
-    st.pyplot(fig)
-    
-    # Allow exploring specific categories and their aspects
-    st.subheader("Explore Category Aspects")
-    selected_category = st.selectbox(
-        "Select a category to see its aspects:",
-        options=category_data['name'].tolist()
+
+    # Create a bar chart of aspect counts by category with dynamic sizing
+    # (20px per category, minimum of 400px)
+    bar_base = alt.Chart(categories_with_data[['name', 'aspectsCount']]).encode(
+        y=alt.Y("name:N", sort="-x", title="Category"),
+        x=alt.X("aspectsCount:Q", title="Number of Aspects"),
     )
+    aspect_count_chart = (
+        (bar_base.mark_bar(tooltip=True) + bar_base.mark_text(align="left", dx=3).encode(text="aspectsCount:Q"))
+        .properties(height=max(400, len(categories_with_data) * 20), title="Number of Aspects by Category")
+    )
+    st.altair_chart(aspect_count_chart, use_container_width=True)
     
-    if selected_category:
-        category_row = category_data[category_data['name'] == selected_category].iloc[0]
-        aspect_list = category_row['aspects_parsed']
-        
-        if aspect_list:
-            st.success(f"The category '{selected_category}' has {len(aspect_list)} aspects:")
-            
-            # Display aspects in a more readable format
-            aspects_df = pd.DataFrame({
-                'Aspect': aspect_list,
-                'Type': [aspect.split('/')[0] if '/' in aspect else 'Other' for aspect in aspect_list],
-                'Subtype': [aspect.split('/')[1] if '/' in aspect else aspect for aspect in aspect_list]
-            })
-            
-            # Group by type and display
-            st.dataframe(aspects_df, use_container_width=True)
-
-            # Create a pie chart showing the distribution of aspect types
-            type_counts = aspects_df['Type'].value_counts().reset_index()
-            type_counts.columns = ['Type', 'Count']
-
-            fig, ax = plt.subplots(figsize=(8, 8))
-            ax.pie(type_counts['Count'], labels=type_counts['Type'].tolist(), autopct='%1.1f%%',
-                   startangle=90)
-            ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-            st.pyplot(fig)
-        else:
-            st.warning(f"The category '{selected_category}' has no aspects defined.")
+    category_detail_fragment(category_data, category_data_path, max_rows)
 
 # Tab 2: Aspect Usage Analysis
 with tabs[1]:
@@ -153,9 +268,8 @@ with tabs[1]:
         top_n = min(20, len(aspect_freq))
         top_aspects = aspect_freq.head(top_n)
 
-        alt_data = alt.Data(values=top_aspects.to_dict("records"))
         top_chart = (
-            alt.Chart(alt_data)
+            alt.Chart(top_aspects)
             .mark_bar()
             .encode(
                 y=alt.Y("aspect:N", sort="-x", title="Aspect"),
@@ -174,9 +288,8 @@ with tabs[1]:
         bottom_n = min(20, len(aspect_freq))
         bottom_aspects = aspect_freq.sort_values(by="count", ascending=True).head(bottom_n)
 
-        alt_data = alt.Data(values=bottom_aspects.to_dict("records"))
         bottom_chart = (
-            alt.Chart(alt_data)
+            alt.Chart(bottom_aspects)
             .mark_bar()
             .encode(
                 y=alt.Y("aspect:N", sort="x", title="Aspect"),
@@ -195,27 +308,6 @@ with tabs[1]:
         # Extract data
         counts = aspect_freq["count"].to_numpy()
 
-        # Summary stats
-        mean_val = np.mean(counts)
-        median_val = np.median(counts)
-
-        fig, ax = plt.subplots(figsize=(10, 6))
-
-        # Histogram
-        ax.hist(counts, bins=20, alpha=0.7, color='steelblue', edgecolor='black')
-
-        # Labels
-        ax.set_xlabel("Number of Categories Using the Aspect")
-        ax.set_ylabel("Number of Aspects")
-        ax.set_title("How Widely Aspects Are Used Across Categories")
-
-        # Gridlines
-        ax.grid(axis="y", linestyle="--", alpha=0.7)
-
-        # Add mean and median lines
-        ax.axvline(mean_val, color='red', linestyle='dashed', linewidth=1.5, label=f'Mean: {mean_val:.1f}')
-        ax.axvline(median_val, color='green', linestyle='dotted', linewidth=1.5, label=f'Median: {median_val:.1f}')
-
         # Annotate histogram with explanation
         st.markdown("""
         This chart shows **how widely aspects are used across different categories**:
@@ -227,11 +319,8 @@ with tabs[1]:
         Use this chart to understand whether your aspects are generally broad or specific.
         """)
 
-        # Legend
-        ax.legend()
-
         # Show chart
-        st.pyplot(fig)
+        st.image(aspect_usage_hist_png(counts), use_container_width=True)
 
         # ────────────────────────────────────────────────────────────────────
         # Aspect-Category matrix
@@ -244,62 +333,7 @@ with tabs[1]:
             """
         )
 
-        matrix_df = create_aspect_category_matrix(category_data)
-
-        if matrix_df is not None and isinstance(matrix_df, pd.DataFrame):
-            max_aspects, max_categories = 500, 500
-
-            if len(matrix_df) > max_aspects:
-                st.info(
-                    f"Showing only the first {max_aspects} aspects for clarity. "
-                    "Download the full matrix below."
-                )
-
-            # Trim to first N categories (after the 'aspect' column)
-            visible_cols = ["aspect"] + list(matrix_df.columns[1 : max_categories + 1])
-            matrix_subset = matrix_df.loc[:, visible_cols].head(max_aspects)
-
-            # Reshape for Altair
-            matrix_long = pd.melt(
-                matrix_subset,
-                id_vars=["aspect"],
-                var_name="category",
-                value_name="present",
-                ignore_index=False,
-            )
-
-            alt_data = alt.Data(values=matrix_long.to_dict("records"))
-            heatmap = (
-                alt.Chart(alt_data)
-                .mark_rect()
-                .encode(
-                    x=alt.X("category:N", title="Category"),
-                    y=alt.Y("aspect:N", title="Aspect"),
-                    color=alt.Color(
-                        "present:Q",
-                        scale=alt.Scale(domain=[0, 1], range=["white", "blue"]),
-                    ),
-                    tooltip=["aspect:N", "category:N", "present:Q"],
-                )
-                .properties(width=1000, height=800, title="Aspect-Category Matrix")
-            )
-            st.altair_chart(heatmap, use_container_width=True)
-
-            # ────────────────────────────────────────────────────────────
-            # Download links
-            # ────────────────────────────────────────────────────────────
-            st.markdown("### Download Full Matrix")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown(
-                    get_csv_download_link(matrix_df, "aspect_category_matrix.csv"),
-                    unsafe_allow_html=True,
-                )
-            with col2:
-                st.markdown(
-                    get_json_download_link(matrix_df, "aspect_category_matrix.json"),
-                    unsafe_allow_html=True,
-                )
+        aspect_matrix_fragment(category_data)
     else:
         st.warning("Analysis results are not available. Please run the analysis first.")
 # Tab 3: Categories without Aspects
@@ -308,7 +342,7 @@ with tabs[2]:
 
     if analysis_results is not None:
         # Filter categories without aspects
-        categories_no_aspects_df = category_data[category_data['aspectsCount'] == 0]
+        categories_no_aspects_df = raw_category_data[raw_category_data['aspectsCount'] == 0]
 
         # Display the actual categories without aspects
         if not categories_no_aspects_df.empty:
@@ -323,15 +357,25 @@ with tabs[3]:
     st.header("Raw Category Data")
     
     # Display the full dataset
-    st.dataframe(category_data, use_container_width=True)
+    st.dataframe(raw_category_data, use_container_width=True)
     
     # Download options
     st.markdown("### Download Data")
     col1, col2 = st.columns(2)
     with col1:
-        st.markdown(get_csv_download_link(category_data, "category_data.csv"), unsafe_allow_html=True)
+        st.download_button(
+            "Download CSV file",
+            data=get_csv_download_data(raw_category_data),
+            file_name="category_data.csv",
+            mime="text/csv",
+        )
     with col2:
-        st.markdown(get_json_download_link(category_data, "category_data.json"), unsafe_allow_html=True)
+        st.download_button(
+            "Download JSON file",
+            data=get_json_download_data(raw_category_data),
+            file_name="category_data.json",
+            mime="application/json",
+        )
 
 # Footer
 st.markdown("---")
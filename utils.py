@@ -1,63 +1,72 @@
 import os
+import numpy as np
 import pandas as pd
-import io
-import base64
-import json
 import ast
 import datetime
+import functools
+import hashlib
+import itertools
+import tempfile
+import orjson
+import pyarrow as pa
 import streamlit as st
 from collections import Counter
 from internal_api import InternalAPIClient
+from utils_fast import HAVE_NUMBA, split_csv_lists
 
 
 # Function to prepare example CSV data
-def generate_example_csv():
+def generate_example_csv(file_path="example_data/review_categories.csv"):
+    """Return the example CSV as bytes.
+
+    The result is cached; the file's mtime is part of the cache key because
+    the Data Upload page can overwrite the example file.
+    """
+    return _read_example_csv(file_path, os.path.getmtime(file_path))
+
+
+@st.cache_data(show_spinner=False)
+def _read_example_csv(file_path, mtime):
     # Read the CSV from the file path
-    df = pd.read_csv("example_data/review_categories.csv")
+    df = pd.read_csv(file_path)
+
+    # Convert DataFrame to CSV bytes in memory
+    return df.to_csv(index=False).encode()
 
-    # Convert DataFrame to CSV in memory (StringIO)
-    output = io.StringIO()
-    df.to_csv(output, index=False)
-    output.seek(0)
 
-    return output
+# Functions to prepare data for `st.download_button`
+def get_csv_download_data(df):
+    """Returns the dataframe as CSV bytes, or None if there is no dataframe"""
+    if df is None:
+        return None
 
+    return with_python_lists(df).to_csv(index=False).encode('utf-8')
 
-# Function to download dataframe as CSV
-def get_csv_download_link(df, filename="analysis_export.csv"):
-    """Generates a link to download the dataframe as a CSV file"""
-    if df is None or df.empty:
-        return "No data to download"
 
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">Download CSV file</a>'
-    return href
+def _json_default(obj):
+    """Serializes the values orjson doesn't handle natively (pandas timestamps, NA, sets)."""
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type {type(obj)} not serializable")
 
 
-def get_json_download_link(data, filename="analysis_export.json"):
-    """Generates a link to download data as a JSON file."""
+def get_json_download_data(data):
+    """Returns data as JSON bytes, or None if there is no data or it can't be serialized."""
     if data is None:
-        return "No data to download"
+        return None
 
     try:
+        # orjson serializes the records (numpy values included) in C
         if isinstance(data, pd.DataFrame):
-            json_str = data.to_json(orient='records', date_format='iso')
-        else:
-            def json_serial(obj):
-                if isinstance(obj, (datetime.datetime, datetime.date)):
-                    return obj.isoformat()
-                raise TypeError(f"Type {type(obj)} not serializable")
-            json_str = json.dumps(data, default=json_serial)
-
-        if not isinstance(json_str, str):
-            raise ValueError("JSON serialization failed, got non-string output.")
-
-        b64 = base64.b64encode(json_str.encode('utf-8')).decode('utf-8')
-        href = f'<a href="data:file/json;base64,{b64}" download="{filename}">Download JSON file</a>'
-        return href
+            data = data.to_dict(orient='records')
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
     except Exception as e:
-        return f"Error generating JSON download link: {str(e)}"
+        st.error(f"Error preparing JSON download: {str(e)}")
+        return None
 
 
 # Function to process a CSV file
@@ -113,6 +122,120 @@ def process_csv(uploaded_file):
         return None
 
 
+# Parse the `aspects` column of uploaded data (shared by the upload page)
+@functools.lru_cache(maxsize=4096)
+def _parse_aspects_text(val):
+    """Parse a stripped aspects string into a tuple of aspect names.
+
+    Returns a tuple so results can be cached: categorical data repeats the
+    same aspects string on many rows, so only the distinct values get parsed.
+    """
+    if val.startswith("[") and val.endswith("]"):
+        try:
+            return tuple(orjson.loads(val.replace("'", '"')))
+        except ValueError:
+            try:
+                return tuple(ast.literal_eval(val))
+            except (ValueError, SyntaxError):
+                return ()
+    return tuple(a.strip() for a in val.split(',') if a.strip())
+
+
+def parse_aspects(val):
+    """Parse an `aspects` cell into a list of aspect names.
+
+    Handles list strings like `['Product/Price', 'Service/Staff']` as well as
+    comma-separated strings like `battery,price,design`. List strings go through
+    orjson first and only fall back to `ast.literal_eval` when that fails,
+    e.g. for aspects containing an apostrophe.
+    """
+    if isinstance(val, list):
+        return val
+    if not isinstance(val, str):
+        if pd.isnull(val):
+            return []
+        val = str(val)
+    return list(_parse_aspects_text(val.strip()))
+
+
+# Columns at least this long split comma-separated aspects with the compiled
+# scanner from utils_fast (when numba is installed)
+FAST_SPLIT_MIN_ROWS = 100_000
+
+# Parsed aspects are stored as a single Arrow list<string> buffer instead of
+# a column of Python list objects
+ASPECTS_DTYPE = pd.ArrowDtype(pa.list_(pa.string()))
+
+
+def as_arrow_lists(lists):
+    """Convert a column of aspect lists to the `ASPECTS_DTYPE` Arrow dtype.
+
+    Falls back to the plain object column if the lists hold something that
+    isn't string-like (e.g. dicts from a JSON upload).
+    """
+    try:
+        return pd.Series(pd.array(lists.tolist(), dtype=ASPECTS_DTYPE), index=lists.index)
+    except pa.ArrowException:
+        return lists
+
+
+def with_python_lists(df):
+    """Return `df` with Arrow list columns converted back to Python lists.
+
+    `to_csv` writes Arrow lists as numpy reprs (`['a' 'b']`) that can't be
+    parsed back, so frames go through this before being written as CSV.
+    """
+    list_columns = [
+        col for col, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.ArrowDtype) and pa.types.is_list(dtype.pyarrow_dtype)
+    ]
+    if not list_columns:
+        return df
+
+    df = df.copy()
+    for col in list_columns:
+        df[col] = pd.Series(df[col].tolist(), index=df.index, dtype=object)
+    return df
+
+
+def parse_aspects_column(aspects, fast_split=None):
+    """Parse a whole `aspects` column into lists of aspect names.
+
+    Comma-separated rows are split in a single vectorized pass with the pandas
+    string accessor; only rows holding a list string (or non-string values)
+    go through `parse_aspects` one at a time. The result uses `ASPECTS_DTYPE`
+    where possible.
+
+    `fast_split` selects the compiled scanner from utils_fast (if numba is
+    installed). By default it is used for columns of at least
+    `FAST_SPLIT_MIN_ROWS` rows; chunked readers pass it based on the size of
+    the whole upload instead.
+    """
+    if fast_split is None:
+        fast_split = len(aspects) >= FAST_SPLIT_MIN_ROWS
+
+    if not (pd.api.types.is_object_dtype(aspects) or pd.api.types.is_string_dtype(aspects)):
+        return as_arrow_lists(aspects.map(parse_aspects))
+
+    text = aspects.str.strip()
+    if not text.notna().any():
+        # No string values at all (e.g. lists straight from JSON)
+        return as_arrow_lists(aspects.map(parse_aspects))
+    is_csv = (text.notna() & ~text.str.startswith("[", na=True)).astype(bool)
+
+    parsed = pd.Series([[] for _ in range(len(aspects))], index=aspects.index, dtype=object)
+    if is_csv.any():
+        if HAVE_NUMBA and fast_split:
+            split = split_csv_lists(text[is_csv].tolist())
+            parsed[is_csv] = pd.Series(split, index=text[is_csv].index, dtype=object)
+        else:
+            split = text[is_csv].str.split(r"\s*,\s*", regex=True)
+            parsed[is_csv] = split.map(lambda parts: [p for p in parts if p])
+    if not is_csv.all():
+        parsed[~is_csv] = aspects[~is_csv].map(parse_aspects)
+    return as_arrow_lists(parsed)
+
+
 # Function to analyze aspects by category
 def analyze_aspects(df):
     """Analyze aspects by category and return analysis DataFrames"""
@@ -182,6 +305,9 @@ def get_api_uploaded_files():
 
 
 # Function to fetch data from internal API
+# Cached for a few minutes so reruns don't repeat the HTTP round-trips;
+# call `.clear()` on the function to force a refetch.
+@st.cache_data(ttl=300, show_spinner=False)
 def fetch_internal_api_data(sort_by="id", sort_order="asc"):
     """
     Fetch category data from the internal API
@@ -207,6 +333,7 @@ def fetch_internal_api_data(sort_by="id", sort_order="asc"):
                                                       sort_order=sort_order)
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 def fetch_internal_all_api_data():
     api_client = InternalAPIClient()
     return api_client.get_all_review_categories()
@@ -246,21 +373,152 @@ def get_aspect_distribution(analysis_df):
     return category_aspect_counts
 
 
+# Resolve which saved category data file to analyze
+def latest_category_data_path(default="example_data/review_categories.csv"):
+    """Return the newer of the CSV and Parquet copies of `default`.
+
+    API fetches save Parquet or CSV depending on the aspects format, so the
+    newest of the two is the last saved data. Used by the Flask API too,
+    which has no session state.
+    """
+    candidates = [
+        p for p in (default, os.path.splitext(default)[0] + ".parquet")
+        if os.path.exists(p)
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else default
+
+
+def get_category_data_path(default="example_data/review_categories.csv"):
+    """Return the category data file most recently saved by the Data Upload page.
+
+    Prefers the path stored in session state, then `latest_category_data_path`.
+    """
+    path = st.session_state.get('category_data_path')
+    if path and os.path.exists(path):
+        return path
+
+    return latest_category_data_path(default)
+
+
+# Known column types of the category CSV; columns missing from a file are ignored.
+# Integer columns are read at full width and only narrowed (CATEGORY_CSV_NARROW_DTYPES)
+# when their values fit, since read_csv wraps out-of-range values silently.
+# Files whose values don't fit these types (blank counts, text ids) are read
+# with inferred types instead, see _read_category_frame.
+CATEGORY_CSV_DTYPES = {
+    'id': 'Int64',
+    'name': 'string[pyarrow]',
+    'aspectsCount': 'int64',
+    'aspects': 'string[pyarrow]',
+}
+
+CATEGORY_CSV_NARROW_DTYPES = {
+    'id': 'Int32',
+    'aspectsCount': 'int16',
+}
+
+
+def _read_category_frame(file_path, nrows=None):
+    """`pd.read_csv` with CATEGORY_CSV_DTYPES, falling back to inference if they don't fit."""
+    try:
+        df = pd.read_csv(file_path, nrows=nrows, dtype=CATEGORY_CSV_DTYPES)
+    except (ValueError, OverflowError):
+        return pd.read_csv(file_path, nrows=nrows)
+
+    for col, dtype in CATEGORY_CSV_NARROW_DTYPES.items():
+        if col in df.columns:
+            info = np.iinfo(dtype.lower())
+            if df[col].between(info.min, info.max).all():
+                df[col] = df[col].astype(dtype)
+    return df
+
+
+def _read_category_csv(file_path, nrows=None):
+    """Read a category CSV with `aspects_parsed` filled in.
+
+    The parsed frame is also written to a Parquet file next to the CSV, and
+    reused while it is newer than the CSV, so a restarted worker skips the CSV
+    parse and the aspects parsing entirely. Partial reads (`nrows`) stop
+    parsing early and bypass that cache.
+    """
+    if nrows is not None:
+        df = _read_category_frame(file_path, nrows=nrows)
+        if 'aspects' in df.columns:
+            df['aspects_parsed'] = [parse_aspects(x) for x in df['aspects'].to_numpy()]
+        return df
+
+    cache_path = os.path.splitext(file_path)[0] + ".parsed.parquet"
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+        try:
+            df = pd.read_parquet(cache_path)
+        except (OSError, ValueError, pa.ArrowException):
+            df = None  # Unreadable cache file; parse the CSV instead
+        if df is not None:
+            if 'aspects_parsed' in df.columns:
+                df['aspects_parsed'] = [
+                    list(x) if isinstance(x, (list, tuple, np.ndarray)) else []
+                    for x in df['aspects_parsed'].to_numpy()
+                ]
+            return df
+
+    df = _read_category_frame(file_path)
+    if 'aspects' in df.columns:
+        df['aspects_parsed'] = [parse_aspects(x) for x in df['aspects'].to_numpy()]
+        _write_parquet_cache(df, cache_path)
+    return df
+
+
+def _write_parquet_cache(df, cache_path):
+    """Write `df` to `cache_path` as Parquet, best effort.
+
+    The file is written under a temporary name in the same directory and then
+    moved into place with `os.replace`, so other sessions never read a
+    half-written cache.
+    """
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or ".", suffix=".parsed.parquet.tmp")
+        os.close(fd)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pa.ArrowException):
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def aspect_sets(df):
+    """Return the `aspects_parsed` column as frozensets (empty for non-list values)."""
+    return pd.Series(
+        [frozenset(x) if isinstance(x, list) else frozenset() for x in df['aspects_parsed'].to_numpy()],
+        index=df.index, dtype=object
+    )
+
+
 # Load the category data from file
 @st.cache_data
-def load_category_data(file_path="example_data/review_categories.csv", max_rows=500):
+def load_category_data(file_path="example_data/review_categories.csv", max_rows=None):
+    """Load category data, optionally only the first `max_rows` categories."""
     try:
-        df = pd.read_csv(file_path)
-
-        # Limit rows to `max_rows` if the dataset is large
-        if len(df) > max_rows:
-            df = df.sample(n=max_rows, random_state=42)
+        if file_path.endswith(".parquet"):
+            # API data is saved with Arrow list columns; read it back Arrow-backed
+            df = pd.read_parquet(file_path, dtype_backend="pyarrow")
+            if max_rows is not None:
+                df = df.head(max_rows)
+
+            # Aspects are stored as real lists already, no parsing needed
+            if 'aspects' in df.columns:
+                df['aspects_parsed'] = df['aspects'].apply(
+                    lambda x: list(x) if isinstance(x, (list, tuple, np.ndarray)) else [])
+        else:
+            df = _read_category_csv(file_path, nrows=max_rows)
 
         # Parse aspects once here
-        if 'aspects' in df.columns:
-            df['aspects_parsed'] = df['aspects'].apply(
-                lambda x: ast.literal_eval(x)
-                if isinstance(x, str) and x.strip().startswith("[") else [])
+        if 'aspects' in df.columns and 'aspects_parsed' not in df.columns:
+            df['aspects_parsed'] = [parse_aspects(x) for x in df['aspects'].to_numpy()]
+
+        # Keep a frozenset per category too, so membership checks never rebuild sets
+        if 'aspects_parsed' in df.columns:
+            df['aspects_parsed_set'] = aspect_sets(df)
 
         return df
     except Exception as e:
@@ -268,56 +526,142 @@ def load_category_data(file_path="example_data/review_categories.csv", max_rows=
         return None
 
 
+# Load review data saved by the Data Upload page
+def load_uploaded_data(file_path="example_data/uploaded_reviews.parquet"):
+    """Load the review data saved by the Data Upload page, or None on error.
+
+    The result is cached; the file's mtime is part of the cache key because
+    each upload overwrites the same file.
+    """
+    try:
+        return _read_uploaded_data(file_path, os.path.getmtime(file_path))
+    except Exception as e:
+        st.error(f"Error loading uploaded data: {str(e)}")
+        return None
+
+
+@st.cache_data(show_spinner=False)
+def _read_uploaded_data(file_path, mtime):
+    # Aspects lists are Arrow list columns; keep them Arrow-backed on read
+    df = pd.read_parquet(file_path, dtype_backend="pyarrow")
+
+    # The upload is streamed with every CSV column as text (so all chunks share
+    # one schema); turn the numeric ones back into numbers like read_csv would
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]):
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                pass  # Not numeric, keep the text
+    return df
+
+
+def _category_frame_key(df):
+    """Cheap `st.cache_data` key for category frames.
+
+    Streamlit's default DataFrame hashing falls back to pickling for the list
+    columns. The helpers below only use the names, aspect counts and aspects,
+    so the key hashes just those: the first two with pandas, the aspects
+    through the (cached) hash of each category's frozenset.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for col in ('name', 'aspectsCount'):
+        if col in df.columns:
+            digest.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+    if 'aspects_parsed_set' in df.columns:
+        sets = df['aspects_parsed_set']
+    elif 'aspects_parsed' in df.columns:
+        sets = aspect_sets(df)
+    else:
+        sets = ()
+    digest.update(np.fromiter((hash(s) for s in sets), dtype=np.int64, count=len(sets)).tobytes())
+    return len(df), digest.hexdigest()
+
+
+CATEGORY_FRAME_HASH_FUNCS = {pd.DataFrame: _category_frame_key}
+
+
+# Count aspects once per frame; shared by the analysis and matrix helpers
+@st.cache_data(show_spinner=False, hash_funcs=CATEGORY_FRAME_HASH_FUNCS)
+def _aspect_counter(df):
+    # Count over one flat iterator instead of calling update() per row
+    return Counter(itertools.chain.from_iterable(
+        aspects_list for aspects_list in df['aspects_parsed'] if isinstance(aspects_list, list)))
+
+
+# Top-N selections for the matrix, cached separately so a new max_aspects or
+# max_categories only redoes its own sort
+@st.cache_data(show_spinner=False, hash_funcs=CATEGORY_FRAME_HASH_FUNCS)
+def _top_aspects(df, max_aspects):
+    return [aspect for aspect, _ in _aspect_counter(df).most_common(max_aspects)]
+
+
+@st.cache_data(show_spinner=False, hash_funcs=CATEGORY_FRAME_HASH_FUNCS)
+def _top_categories(df, max_categories):
+    """Return (name, aspect frozenset) pairs of the categories with the most aspects."""
+    top_categories = df.nlargest(max_categories, 'aspectsCount')
+    if 'aspects_parsed_set' in top_categories.columns:
+        top_sets = top_categories['aspects_parsed_set']
+    else:
+        top_sets = aspect_sets(top_categories)
+    return list(zip(top_categories['name'], top_sets))
+
+
+# Row position of each category name (first occurrence), for O(1) row lookups.
+# A resource keyed like load_category_data: built once per loaded file and
+# returned as-is, without hashing the frame or unpickling a copy on each call.
+@st.cache_resource(show_spinner=False)
+def category_name_positions(file_path, max_rows=None):
+    df = load_category_data(file_path, max_rows=max_rows)
+    name_to_idx = {}
+    if df is not None:
+        for i, name in enumerate(df['name'].tolist()):
+            name_to_idx.setdefault(name, i)
+    return name_to_idx
+
+
 # Analyze aspects across categories
-@st.cache_data
+@st.cache_data(hash_funcs=CATEGORY_FRAME_HASH_FUNCS)
 def analyze_category_aspects(df):
     """Optimize aspect analysis for large datasets."""
     if df is None or 'aspects_parsed' not in df.columns:
         return None
 
-    aspect_counts = Counter()
-    for aspects_list in df['aspects_parsed']:
-        if isinstance(aspects_list, list):
-            aspect_counts.update(aspects_list)
+    aspect_counts = _aspect_counter(df)
 
-    aspect_freq = pd.DataFrame({
-        'aspect': [aspect for aspect, _ in aspect_counts.most_common()],
-        'count': [count for _, count in aspect_counts.most_common()]
-    })
+    # Sort once and build both columns from the same list
+    aspect_freq = pd.DataFrame(aspect_counts.most_common(), columns=['aspect', 'count'])
 
     return aspect_freq
 
 
 # Create a matrix of aspects by category
-@st.cache_data
+@st.cache_data(hash_funcs=CATEGORY_FRAME_HASH_FUNCS)
 def create_aspect_category_matrix(df, max_aspects=1000, max_categories=500):
     if df is None or 'aspects_parsed' not in df.columns:
         return None
 
-    # Count all aspects
-    aspect_counts = Counter()
-    for aspects_list in df['aspects_parsed']:
-        if isinstance(aspects_list, list):
-            aspect_counts.update(aspects_list)
-
     # Select top aspects and top categories
-    top_aspects = [aspect for aspect, _ in aspect_counts.most_common(max_aspects)]
-    top_categories = df.nlargest(max_categories, 'aspectsCount')
-
-    # Build matrix data
-    matrix_data = []
-    for aspect in top_aspects:
-        row = {'aspect': aspect}
-        for category in top_categories['name']:
-            # Get aspects for the category
-            aspects_in_category = df.loc[df['name'] == category, 'aspects_parsed'].values
-            if aspects_in_category.size > 0 and isinstance(aspects_in_category[0], list):
-                row[category] = 1 if aspect in aspects_in_category[0] else 0
-            else:
-                row[category] = 0
-        matrix_data.append(row)
-
-    # Create DataFrame with 'aspect' as a **column**, not index
-    matrix = pd.DataFrame(matrix_data)
+    top_aspects = _top_aspects(df, max_aspects)
+    aspect_to_row = {aspect: i for i, aspect in enumerate(top_aspects)}
+
+    # Aspect set per category, precomputed by load_category_data (duplicate names are merged)
+    cat_sets = {}
+    for name, aspect_set in _top_categories(df, max_categories):
+        cat_sets[name] = cat_sets[name] | aspect_set if name in cat_sets else aspect_set
+
+    # Fill a preallocated int8 0/1 matrix (1 byte per cell instead of int64's 8).
+    # Iterating each category's own aspects only touches the non-zero cells.
+    category_names = list(cat_sets)
+    values = np.zeros((len(top_aspects), len(category_names)), dtype=np.int8)
+    for j, aspect_set in enumerate(cat_sets.values()):
+        for aspect in aspect_set:
+            i = aspect_to_row.get(aspect)
+            if i is not None:
+                values[i, j] = 1
+
+    # Keep 'aspect' as a **column**, not index
+    matrix = pd.DataFrame(values, columns=category_names)
+    matrix.insert(0, 'aspect', top_aspects)
 
     return matrix 
\ No newline at end of file
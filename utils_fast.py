@@ -0,0 +1,89 @@
+"""Compiled helpers for parsing very large aspects columns.
+
+numba is optional. Without it `split_csv_lists` falls back to plain Python
+string splitting, and callers can check `HAVE_NUMBA` to decide whether the
+compiled path is worth using.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# Byte values used by the scanner
+_ROW_SEP = 0      # rows are joined with NUL before scanning
+_COMMA = 44
+
+
+def _field_offsets(buf):
+    """Scan NUL-separated rows of comma-separated fields.
+
+    Returns (starts, ends, rows) arrays with the byte offsets of every
+    non-empty, whitespace-stripped field and the row it belongs to.
+    """
+    n = buf.size
+    starts = np.empty(n + 1, np.int64)
+    ends = np.empty(n + 1, np.int64)
+    rows = np.empty(n + 1, np.int64)
+    count = 0
+    row = 0
+    field_start = 0
+    for i in range(n + 1):
+        c = _ROW_SEP if i == n else buf[i]
+        if c != _COMMA and c != _ROW_SEP:
+            continue
+
+        s = field_start
+        e = i
+        while s < e and (buf[s] == 9 or buf[s] == 10 or buf[s] == 13 or buf[s] == 32):
+            s += 1
+        while e > s and (buf[e - 1] == 9 or buf[e - 1] == 10 or buf[e - 1] == 13 or buf[e - 1] == 32):
+            e -= 1
+        if e > s:
+            starts[count] = s
+            ends[count] = e
+            rows[count] = row
+            count += 1
+
+        field_start = i + 1
+        if c == _ROW_SEP:
+            row += 1
+    return starts[:count], ends[:count], rows[:count]
+
+
+if HAVE_NUMBA:
+    # cache=True keeps the compiled code on disk so restarts don't recompile
+    _field_offsets = njit(cache=True)(_field_offsets)
+
+
+def split_csv_lists(values):
+    """Split comma-separated strings into lists of stripped, non-empty items.
+
+    Parameters:
+    -----------
+    values : list of str
+        The strings to split, e.g. `["battery, price", "design"]`
+
+    Returns:
+    --------
+    list of list of str
+        One list of items per input string
+    """
+    # NUL is the row separator below, so values containing it take the plain path
+    if not HAVE_NUMBA or any("\x00" in v for v in values):
+        return [[a.strip() for a in v.split(',') if a.strip()] for v in values]
+
+    # Commas never occur inside multi-byte UTF-8 sequences, so scanning bytes is safe
+    buf = "\x00".join(values).encode("utf-8")
+    starts, ends, rows = _field_offsets(np.frombuffer(buf, dtype=np.uint8))
+
+    # The scanner only trims ASCII whitespace; str.strip() also removes Unicode
+    # whitespace (e.g. NBSP), matching `str.split(r"\s*,\s*")` in pandas
+    result = [[] for _ in values]
+    for s, e, r in zip(starts.tolist(), ends.tolist(), rows.tolist()):
+        field = buf[s:e].decode("utf-8").strip()
+        if field:
+            result[r].append(field)
+    return result